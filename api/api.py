@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Dict
+import copy
+from typing import Dict, Tuple
 
 from url_features import extract_features
 from html_parser import analyze_html_for_forms
@@ -11,20 +12,64 @@ from domain_info import analyze_domain
 from tls_check import check_tls
 from ml_scorer import score_with_model
 
+# URL feeds often repeat entries across refreshes; completed analyses are
+# kept (keyed on the stripped URL) so duplicates skip the network entirely.
+# Entries never expire, so transient failures (fetch errors, DNS misses)
+# are also served for the process lifetime; long-running callers that need
+# fresh answers should clear the cache between runs.
+_CACHE_MAX_ENTRIES = 50_000
+_result_cache: Dict[Tuple[str, bool], Dict] = {}
+
+
+def _copy_result(result: Dict, cache_hit: bool) -> Dict:
+    # Deep copy: results nest lists and dicts (reasons, keywords_found,
+    # cert_subject, ...), and sharing any of them would let callers mutate
+    # what later duplicate-URL lookups receive.
+    out = copy.deepcopy(result)
+    out["cache_hit"] = cache_hit
+    return out
+
+
+def analyze_url(url: str, with_ml: bool = True) -> Dict:
+    """Run the full analysis pipeline and return a structured response.
+
+    Batch callers can pass ``with_ml=False`` and score URLs in bulk via
+    ml_scorer.score_with_model_batch instead of paying the per-call
+    transform/predict overhead here.
+    """
+    key = (url.strip(), with_ml)
+    cached = _result_cache.get(key)
+    if cached is not None:
+        return _copy_result(cached, cache_hit=True)
 
-def analyze_url(url: str) -> Dict:
-    """Run the full analysis pipeline and return a structured response."""
     features = extract_features(url)
-    features.update(analyze_domain(features["url"]))
-    features.update(check_tls(features["url"]))
+    # extract_features already normalized and parsed the URL; reuse its host
+    # instead of re-deriving it in every stage.
+    features.update(
+        analyze_domain(
+            features["url"],
+            host=features["host"],
+            digit_count=features["host_digit_count"],
+            alpha_count=features["host_alpha_count"],
+        )
+    )
+    features.update(check_tls(features["url"], host=features["host"]))
     features.update(analyze_html_for_forms(features["url"]))
 
     heuristic = score_features(features)
-    ml = score_with_model(features)
+    if with_ml:
+        ml = score_with_model(features)
+    else:
+        ml = {"available": False, "reason": "ML scoring deferred to batch"}
 
-    return {
+    result = {
         "url": features.get("url"),
         "features": features,
         "heuristic": heuristic,
         "ml": ml,
     }
+
+    if len(_result_cache) >= _CACHE_MAX_ENTRIES:
+        _result_cache.pop(next(iter(_result_cache)))
+    _result_cache[key] = result
+    return _copy_result(result, cache_hit=False)
@@ -5,11 +5,37 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, Optional
 
 from api.api import analyze_url
+from ml_scorer import score_with_model_batch
+
+# Serial collection defers ML scoring and runs it once per chunk of results;
+# sklearn's per-call overhead dominates single-row transform/predict.
+_ML_BATCH_SIZE = 256
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_bytes(obj) -> bytes:
+    """Serialize one output row to UTF-8 JSON, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _dumps_str(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
 
 
 def _normalize_input_format(path: Path, explicit: Optional[str]) -> str:
@@ -41,7 +67,7 @@ def _read_txt(path: Path) -> Iterator[Dict]:
 
 
 def _read_csv(path: Path) -> Iterator[Dict]:
-    with path.open("r", encoding="utf-8", newline="") as handle:
+    with path.open("r", encoding="utf-8", newline="", buffering=1 << 20) as handle:
         reader = csv.DictReader(handle)
         for row in reader:
             if not row:
@@ -57,16 +83,19 @@ def _read_csv(path: Path) -> Iterator[Dict]:
 
 
 def _read_jsonl(path: Path) -> Iterator[Dict]:
-    with path.open("r", encoding="utf-8") as handle:
+    # Binary reads with a 1 MiB buffer; orjson parses the raw bytes directly
+    # when available (stdlib json accepts bytes as well).
+    loads = orjson.loads if orjson is not None else json.loads
+    with path.open("rb", buffering=1 << 20) as handle:
         for line in handle:
             raw = line.strip()
             if not raw:
                 continue
-            if raw.startswith("#"):
+            if raw.startswith(b"#"):
                 continue
             try:
-                data = json.loads(raw)
-            except json.JSONDecodeError:
+                data = loads(raw)
+            except ValueError:
                 continue
             if isinstance(data, str):
                 data = {"url": data}
@@ -108,47 +137,94 @@ def _summarize_result(result: Dict, label: Optional[str]) -> Dict:
 
 
 def _write_jsonl(rows: Iterable[Dict], path: Path) -> None:
-    with path.open("w", encoding="utf-8") as handle:
+    # Binary mode with a 1 MiB buffer: rows are flushed in large writes
+    # rather than one syscall per line.
+    with path.open("wb", buffering=1 << 20) as handle:
         for row in rows:
-            handle.write(json.dumps(row, ensure_ascii=False))
-            handle.write("\n")
+            handle.write(_dumps_bytes(row))
+            handle.write(b"\n")
 
 
 def _write_csv(rows: Iterable[Dict], path: Path) -> None:
-    rows = list(rows)
-    if not rows:
+    # Pull the first row to derive the header, then stream the rest so the
+    # batch is never fully materialized in memory.
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
         return
-    fieldnames = list(rows[0].keys())
-    with path.open("w", encoding="utf-8", newline="") as handle:
+    fieldnames = list(first.keys())
+    with path.open("w", encoding="utf-8", newline="", buffering=1 << 20) as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
-        for row in rows:
+        for row in chain([first], rows):
             row = dict(row)
             if "features" in row:
-                row["features"] = json.dumps(row["features"], ensure_ascii=False)
+                row["features"] = _dumps_str(row["features"])
             if "heuristic_predicted_categories" in row:
-                row["heuristic_predicted_categories"] = json.dumps(
-                    row["heuristic_predicted_categories"], ensure_ascii=False
-                )
+                row["heuristic_predicted_categories"] = _dumps_str(row["heuristic_predicted_categories"])
             if "heuristic_reasons" in row:
-                row["heuristic_reasons"] = json.dumps(row["heuristic_reasons"], ensure_ascii=False)
+                row["heuristic_reasons"] = _dumps_str(row["heuristic_reasons"])
             writer.writerow(row)
 
 
-def run_collect(input_path: Path, output_path: Path, input_format: str, output_format: str) -> None:
-    outputs = []
-    for entry in _iter_inputs(input_path, input_format):
-        url = entry.get("url")
-        label = entry.get("label")
-        if not url:
-            continue
-        result = analyze_url(url)
-        outputs.append(_summarize_result(result, label))
+def _analyze_and_summarize(entry: Dict) -> Dict:
+    """Top-level worker for process pools: analyze one entry and summarize it."""
+    return _summarize_result(analyze_url(entry["url"]), entry.get("label"))
+
+
+def run_collect(
+    input_path: Path,
+    output_path: Path,
+    input_format: str,
+    output_format: str,
+    concurrency: int = 1,
+    workers: int = 1,
+) -> None:
+    if workers > 1 or workers == 0:
+        # Parsing and scoring are CPU-bound; shard entries across processes so
+        # each worker runs the full pipeline without contending for the GIL.
+        entries = [entry for entry in _iter_inputs(input_path, input_format) if entry.get("url")]
+        max_workers = workers if workers > 0 else os.cpu_count()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outputs = executor.map(_analyze_and_summarize, entries, chunksize=16)
+            if output_format == "csv":
+                _write_csv(outputs, output_path)
+            else:
+                _write_jsonl(outputs, output_path)
+        return
+
+    if concurrency > 1:
+        try:
+            from collect_async import run_collect_async
+        except ImportError:
+            print("httpx is not installed; falling back to serial collection", file=sys.stderr)
+        else:
+            entries = [entry for entry in _iter_inputs(input_path, input_format) if entry.get("url")]
+            run_collect_async(entries, output_path, output_format, concurrency)
+            return
+
+    def _flush(batch) -> Iterator[Dict]:
+        ml_results = score_with_model_batch([result.get("url") or "" for result, _ in batch])
+        for (result, label), ml in zip(batch, ml_results):
+            result["ml"] = ml
+            yield _summarize_result(result, label)
+        batch.clear()
+
+    def _rows() -> Iterator[Dict]:
+        batch = []
+        for entry in _iter_inputs(input_path, input_format):
+            url = entry.get("url")
+            if not url:
+                continue
+            batch.append((analyze_url(url, with_ml=False), entry.get("label")))
+            if len(batch) >= _ML_BATCH_SIZE:
+                yield from _flush(batch)
+        yield from _flush(batch)
 
     if output_format == "csv":
-        _write_csv(outputs, output_path)
+        _write_csv(_rows(), output_path)
     else:
-        _write_jsonl(outputs, output_path)
+        _write_jsonl(_rows(), output_path)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -165,6 +241,18 @@ def build_parser() -> argparse.ArgumentParser:
         choices=["jsonl", "csv"],
         help="Override output format detection",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of URLs to analyze in flight (requires httpx when > 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for CPU-bound parse+score (0 = cpu count)",
+    )
     return parser
 
 
@@ -181,7 +269,14 @@ def main() -> None:
     input_format = _normalize_input_format(input_path, args.input_format)
     output_format = _normalize_output_format(output_path, args.output_format)
 
-    run_collect(input_path, output_path, input_format, output_format)
+    run_collect(
+        input_path,
+        output_path,
+        input_format,
+        output_format,
+        concurrency=args.concurrency,
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
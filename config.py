@@ -1,15 +1,22 @@
 """Configuration for the phishing detection tool."""
 
 from dataclasses import dataclass
+from functools import lru_cache
 import os
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     request_timeout: float = 6.0
     tls_timeout: float = 5.0
     dns_timeout: float = 4.0
     user_agent: str = "PhishDetector/1.0 (+https://example.com)"
+    max_html_bytes: int = 512 * 1024
+
+
+# With slots, class attributes are member descriptors rather than default
+# values, so defaults are read off a default-constructed instance.
+_DEFAULTS = Settings()
 
 
 def _env_float(name: str, default: float) -> float:
@@ -22,11 +29,26 @@ def _env_float(name: str, default: float) -> float:
         return default
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
-    """Load settings from environment variables with safe defaults."""
+    """Load settings from environment variables with safe defaults.
+
+    Cached: the environment is only read on the first call, so per-URL
+    callers do not rebuild the frozen Settings instance."""
     return Settings(
-        request_timeout=_env_float("PHISH_REQUEST_TIMEOUT", Settings.request_timeout),
-        tls_timeout=_env_float("PHISH_TLS_TIMEOUT", Settings.tls_timeout),
-        dns_timeout=_env_float("PHISH_DNS_TIMEOUT", Settings.dns_timeout),
-        user_agent=os.getenv("PHISH_USER_AGENT", Settings.user_agent),
+        request_timeout=_env_float("PHISH_REQUEST_TIMEOUT", _DEFAULTS.request_timeout),
+        tls_timeout=_env_float("PHISH_TLS_TIMEOUT", _DEFAULTS.tls_timeout),
+        dns_timeout=_env_float("PHISH_DNS_TIMEOUT", _DEFAULTS.dns_timeout),
+        user_agent=os.getenv("PHISH_USER_AGENT", _DEFAULTS.user_agent),
+        max_html_bytes=_env_int("PHISH_MAX_HTML_BYTES", _DEFAULTS.max_html_bytes),
     )
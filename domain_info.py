@@ -2,50 +2,92 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import socket
-from urllib.parse import urlparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from config import get_settings
+from url_features import parse_url
 
+# Shared resolver pool: getaddrinfo blocks, and mutating the process-global
+# socket.setdefaulttimeout is not thread-safe. Resolutions run on this pool
+# with a per-call timeout instead, and recent answers are cached briefly so
+# duplicate hosts in a batch cost nothing.
+_DNS_CACHE_TTL = 300.0
+_dns_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="dns")
+_resolve_cache: Dict[str, Tuple[float, List[str]]] = {}
+_resolve_cache_lock = threading.Lock()
 
-def _normalize_url(url: str) -> str:
-    url = url.strip()
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "http://" + url
-    return url
+
+def _resolve(host: str, timeout: float) -> List[str]:
+    """Resolve ``host`` to a list of unique IPs, raising OSError on failure."""
+    now = time.monotonic()
+    with _resolve_cache_lock:
+        cached = _resolve_cache.get(host)
+        if cached and now - cached[0] < _DNS_CACHE_TTL:
+            return list(cached[1])
+
+    future = _dns_executor.submit(socket.getaddrinfo, host, None)
+    try:
+        infos = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise OSError(f"DNS resolution timed out for {host}")
+
+    resolved_ips: List[str] = []
+    for info in infos:
+        ip = info[4][0]
+        if ip not in resolved_ips:
+            resolved_ips.append(ip)
+
+    with _resolve_cache_lock:
+        _resolve_cache[host] = (time.monotonic(), resolved_ips)
+    return list(resolved_ips)
 
 
 def _split_labels(host: str) -> List[str]:
     return [label for label in host.split(".") if label]
 
 
-def analyze_domain(url: str) -> Dict:
-    """Return domain-related signals and DNS resolution details."""
+def analyze_domain(
+    url: str,
+    host: str | None = None,
+    digit_count: int | None = None,
+    alpha_count: int | None = None,
+) -> Dict:
+    """Return domain-related signals and DNS resolution details.
+
+    ``host`` may be supplied by callers that already parsed the URL, and
+    ``digit_count``/``alpha_count`` by callers that already scanned it
+    (extract_features emits both), saving redundant per-stage work.
+    """
     settings = get_settings()
-    normalized = _normalize_url(url)
-    parsed = urlparse(normalized)
-    host = parsed.hostname or ""
+    if host is None:
+        host = parse_url(url)["host"]
     labels = _split_labels(host)
 
     registrable_guess = ""
     if len(labels) >= 2:
         registrable_guess = ".".join(labels[-2:])
 
-    digit_count = sum(ch.isdigit() for ch in host)
-    alpha_count = sum(ch.isalpha() for ch in host)
+    if digit_count is None or alpha_count is None:
+        # One pass over the host instead of a generator per character class.
+        digit_count = 0
+        alpha_count = 0
+        for ch in host:
+            if ch.isdigit():
+                digit_count += 1
+            elif ch.isalpha():
+                alpha_count += 1
     digit_ratio = round(digit_count / max(len(host), 1), 3)
 
     resolved_ips: List[str] = []
     dns_resolves = False
     if host:
         try:
-            socket.setdefaulttimeout(settings.dns_timeout)
-            infos = socket.getaddrinfo(host, None)
-            for info in infos:
-                ip = info[4][0]
-                if ip not in resolved_ips:
-                    resolved_ips.append(ip)
+            resolved_ips = _resolve(host, settings.dns_timeout)
             dns_resolves = bool(resolved_ips)
         except OSError:
             dns_resolves = False
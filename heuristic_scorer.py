@@ -1,144 +1,166 @@
 # heuristic_scorer.py
 # Rule-based scorer converting URL features (+HTML signals) into a risk verdict
 
+import re
 from typing import Dict, List
 
+from url_features import SUSPICIOUS_TLDS
+
 CATEGORIES = ["credential_theft", "card_theft", "info_gathering", "malware"]
 BRAND_KEYWORDS = {"paypal", "google", "microsoft", "bank", "visa", "mastercard", "apple", "facebook", "instagram"}
 
-def _add_reason(reasons: List[str], reason: str):
-    if reason not in reasons:
-        reasons.append(reason)
+# One precompiled alternation scans the host in a single pass instead of one
+# substring search per brand; longest-first ordering keeps matches greedy.
+_BRAND_RE = re.compile("|".join(re.escape(b) for b in sorted(BRAND_KEYWORDS, key=len, reverse=True)))
+
+# Keyword groups as module-level frozensets so score_features does one
+# intersection per group instead of rebuilding literal sets on every call.
+_CRED_KW = frozenset({"login", "secure", "verify", "account"})
+_CARD_KW = frozenset({"card", "billing", "payment"})
+_PROMO_KW = frozenset({"survey", "free", "claim"})
+_DOWNLOAD_KW = frozenset({"download", "setup"})
 
 def score_features(features: Dict) -> Dict:
     """Improved scorer with brand-impersonation and HTML-form signals."""
     score = 0.0
     reasons: List[str] = []
-    cat_scores = {c: 0.0 for c in CATEGORIES}
-
-    # locals
-    url = features.get("url", "").lower()
-    host = features.get("host", "").lower()
-    tld = features.get("tld", "")
-    url_length = features.get("url_length", 0)
-    param_count = features.get("param_count", 0)
-    special_char_count = features.get("special_char_count", 0)
-    suspicious_tld = features.get("suspicious_tld", False)
-    has_ip = features.get("has_ip", False)
-    keywords = features.get("keywords_found", [])
-    host_entropy = features.get("host_entropy", 0.0)
-    path_entropy = features.get("path_entropy", 0.0)
-    has_double_slash = features.get("has_double_slash", False)
-    redirect_count = features.get("redirect_count", 0)
-    external_form_action = features.get("external_form_action", False)
-    external_domain_count = features.get("external_domain_count", 0)
-    external_script_count = features.get("external_script_count", 0)
-    iframe_count = features.get("iframe_count", 0)
-    meta_refresh = features.get("meta_refresh", False)
-    suspicious_js = features.get("suspicious_js_keywords", [])
-    word_count = features.get("word_count", 0)
+    seen_reasons = set()
+
+    def add_reason(reason: str) -> None:
+        # set-backed dedup: O(1) membership instead of scanning the list
+        if reason not in seen_reasons:
+            seen_reasons.add(reason)
+            reasons.append(reason)
+
+    cat_scores = dict.fromkeys(CATEGORIES, 0.0)
+
+    # locals: bind the dict lookup once; every feature read below is then a
+    # plain local call instead of a repeated attribute lookup
+    get = features.get
+    url = get("url", "").lower()
+    host = get("host", "").lower()
+    tld = get("tld", "")
+    url_length = get("url_length", 0)
+    param_count = get("param_count", 0)
+    special_char_count = get("special_char_count", 0)
+    suspicious_tld = get("suspicious_tld", False)
+    has_ip = get("has_ip", False)
+    keywords = get("keywords_found", [])
+    host_entropy = get("host_entropy", 0.0)
+    path_entropy = get("path_entropy", 0.0)
+    has_double_slash = get("has_double_slash", False)
+    redirect_count = get("redirect_count", 0)
+    external_form_action = get("external_form_action", False)
+    external_domain_count = get("external_domain_count", 0)
+    external_script_count = get("external_script_count", 0)
+    iframe_count = get("iframe_count", 0)
+    meta_refresh = get("meta_refresh", False)
+    suspicious_js = get("suspicious_js_keywords", [])
+    word_count = get("word_count", 0)
 
     # base signals
     if suspicious_tld:
         score += 0.22
-        _add_reason(reasons, "Suspicious top-level domain")
+        add_reason("Suspicious top-level domain")
     if has_ip:
         score += 0.30
-        _add_reason(reasons, "URL uses an IP address instead of domain")
+        add_reason("URL uses an IP address instead of domain")
     if url_length > 80:
         score += 0.12
-        _add_reason(reasons, "Unusually long URL")
+        add_reason("Unusually long URL")
     if special_char_count > 5:
         score += 0.10
-        _add_reason(reasons, "Many special characters in URL")
+        add_reason("Many special characters in URL")
     if host_entropy and host_entropy > 3.2:
         score += 0.09
-        _add_reason(reasons, "High entropy in host (looks random/auto-generated)")
+        add_reason("High entropy in host (looks random/auto-generated)")
     if path_entropy and path_entropy > 4.0:
         score += 0.06
-        _add_reason(reasons, "High entropy in path (suspicious)")
+        add_reason("High entropy in path (suspicious)")
 
     # HTML form signals (if provided)
-    if features.get("has_password_input"):
+    if get("has_password_input"):
         score += 0.35
         cat_scores["credential_theft"] += 1.2
-        _add_reason(reasons, "Page contains password input (login form detected)")
-    if features.get("has_card_inputs"):
+        add_reason("Page contains password input (login form detected)")
+    if get("has_card_inputs"):
         score += 0.45
         cat_scores["card_theft"] += 1.4
-        _add_reason(reasons, "Page contains card-related input fields")
+        add_reason("Page contains card-related input fields")
     if external_form_action:
         score += 0.25
-        _add_reason(reasons, "Form submits to a different domain")
+        add_reason("Form submits to a different domain")
         cat_scores["credential_theft"] += 0.8
 
     # keyword signals
-    kw = set(k.lower() for k in keywords)
-    if kw & {"login", "secure", "verify", "account"}:
+    kw = frozenset(k.lower() for k in keywords)
+    cred_hits = kw & _CRED_KW
+    if cred_hits:
         score += 0.30
-        _add_reason(reasons, f"Suspicious keywords in URL: {', '.join(sorted(kw & {'login','secure','verify','account'}))}")
+        add_reason(f"Suspicious keywords in URL: {', '.join(sorted(cred_hits))}")
         cat_scores["credential_theft"] += 1.0
-    if kw & {"card", "billing", "payment"}:
+    card_hits = kw & _CARD_KW
+    if card_hits:
         score += 0.30
-        _add_reason(reasons, f"Payment/card-related keywords: {', '.join(sorted(kw & {'card','billing','payment'}))}")
+        add_reason(f"Payment/card-related keywords: {', '.join(sorted(card_hits))}")
         cat_scores["card_theft"] += 1.0
-    if kw & {"survey", "free", "claim"}:
+    if kw & _PROMO_KW:
         score += 0.08
-        _add_reason(reasons, "Promotional/offer keywords (possible info harvesting)")
+        add_reason("Promotional/offer keywords (possible info harvesting)")
         cat_scores["info_gathering"] += 0.6
-    if kw & {"download", "setup"} or url.endswith((".exe", ".zip", ".scr", ".msi")):
+    if kw & _DOWNLOAD_KW or url.endswith((".exe", ".zip", ".scr", ".msi")):
         score += 0.45
-        _add_reason(reasons, "URL links to downloadable executable or archive")
+        add_reason("URL links to downloadable executable or archive")
         cat_scores["malware"] += 1.2
 
     # brand impersonation
-    for brand in BRAND_KEYWORDS:
-        if brand in host:
-            # naive impersonation check: brand in host but not exact brand.tld
-            if not host.startswith(brand + "."):
-                score += 0.40
-                _add_reason(reasons, f"Host contains brand name '{brand}' (possible impersonation)")
-                cat_scores["credential_theft"] += 1.0
-                break
+    for match in _BRAND_RE.finditer(host):
+        brand = match.group(0)
+        # naive impersonation check: brand in host but not exact brand.tld
+        if not host.startswith(brand + "."):
+            score += 0.40
+            add_reason(f"Host contains brand name '{brand}' (possible impersonation)")
+            cat_scores["credential_theft"] += 1.0
+            break
 
     # structure signals
     if param_count >= 5:
         score += 0.06
-        _add_reason(reasons, "Many query parameters in URL")
+        add_reason("Many query parameters in URL")
     if has_double_slash:
         score += 0.05
-        _add_reason(reasons, "Unusual double-slash in path")
+        add_reason("Unusual double-slash in path")
     if redirect_count >= 3:
         score += 0.10
-        _add_reason(reasons, "Multiple redirects before reaching content")
+        add_reason("Multiple redirects before reaching content")
     if meta_refresh:
         score += 0.12
-        _add_reason(reasons, "Meta refresh redirect detected")
+        add_reason("Meta refresh redirect detected")
     if iframe_count >= 2:
         score += 0.10
-        _add_reason(reasons, "Page contains multiple iframes")
+        add_reason("Page contains multiple iframes")
     if external_domain_count >= 5:
         score += 0.08
-        _add_reason(reasons, "Page loads content from many external domains")
+        add_reason("Page loads content from many external domains")
     if external_script_count >= 3:
         score += 0.08
-        _add_reason(reasons, "Page loads several external scripts")
+        add_reason("Page loads several external scripts")
     if suspicious_js:
         score += 0.18
-        _add_reason(reasons, "Suspicious JavaScript patterns detected")
+        add_reason("Suspicious JavaScript patterns detected")
         cat_scores["malware"] += 0.6
-    if word_count and word_count < 80 and features.get("has_login_form"):
+    if word_count and word_count < 80 and get("has_login_form"):
         score += 0.06
-        _add_reason(reasons, "Sparse page text with login form")
+        add_reason("Sparse page text with login form")
 
     # suspicious TLD boosts
-    if tld in ("zip", "xyz", "top", "gq", "tk", "ml"):
+    if tld in SUSPICIOUS_TLDS:
         cat_scores["credential_theft"] += 0.20
         cat_scores["malware"] += 0.12
 
     # joint indicators
     if cat_scores["credential_theft"] > 0 and cat_scores["card_theft"] > 0:
-        _add_reason(reasons, "Indicators for both credential and card theft")
+        add_reason("Indicators for both credential and card theft")
         score += 0.10
 
     # clamp base score
@@ -151,7 +173,7 @@ def score_features(features: Dict) -> Dict:
 
     if not predicted and score >= 0.65:
         predicted = ["credential_theft"]
-        _add_reason(reasons, "High overall risk without clear category: fallback to credential_theft")
+        add_reason("High overall risk without clear category: fallback to credential_theft")
 
     final_score = score * 0.65 + (max(scaled.values()) if scaled else 0.0) * 0.35
     final_score = round(max(0.0, min(final_score, 1.0)), 3)
@@ -1,14 +1,32 @@
 # html_parser.py
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict, List
 from urllib.parse import urlparse, urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from config import get_settings
 
+try:
+    import lxml  # noqa: F401
+
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+
+_CARD_LIKE_FIELDS = frozenset({
+    "card", "cardnumber", "card_number", "cc-number", "cc_number",
+    "ccnumber", "cvv", "cvc", "expiry", "exp",
+})
 
 SUSPICIOUS_JS_KEYWORDS = (
     "eval(",
@@ -19,7 +37,23 @@ SUSPICIOUS_JS_KEYWORDS = (
 )
 
 
+_session = None
+
+
+def _get_session() -> requests.Session:
+    """Shared Session so repeated fetches reuse pooled keep-alive connections."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = get_settings().user_agent
+        _session = session
+    return _session
+
+
+@lru_cache(maxsize=4096)
 def _host(url: str) -> str:
+    # Pages repeat link hosts heavily (same CDN, same tracker domains),
+    # and .hostname re-parses the netloc per access — memoize per URL.
     return urlparse(url).hostname or ""
 
 
@@ -29,20 +63,12 @@ def _is_external(base_host: str, url: str) -> bool:
 
 
 def _count_external_domains(base_host: str, urls: List[str]) -> int:
-    domains = {_host(u).lower() for u in urls if _host(u)}
+    domains = {h.lower() for h in map(_host, urls) if h}
     return len({d for d in domains if d != base_host.lower()})
 
 
-def analyze_html_for_forms(url: str) -> Dict:
-    """
-    Returns a dict with keys:
-      - has_login_form (bool)
-      - has_password_input (bool)
-      - has_card_inputs (bool)
-      - detected_fields (list)
-    """
-    settings = get_settings()
-    result = {
+def _empty_result() -> Dict:
+    return {
         "has_login_form": False,
         "has_password_input": False,
         "has_card_inputs": False,
@@ -63,100 +89,236 @@ def analyze_html_for_forms(url: str) -> Dict:
         "final_url": None,
         "status_code": None,
         "suspicious_js_keywords": [],
+        "html_truncated": False,
         "html_fetch_error": None,
     }
 
-    try:
-        headers = {"User-Agent": settings.user_agent}
-        r = requests.get(
-            url,
-            timeout=settings.request_timeout,
-            headers=headers,
-            allow_redirects=True,
-        )
 
-        result["status_code"] = r.status_code
-        result["final_url"] = r.url
-        result["redirect_count"] = len(r.history)
+def _scan_form_fields(names: List[str], types: List[str], result: Dict) -> None:
+    """Apply the per-form input signals shared by both parser backends."""
+    if "password" in types or any("password" in n for n in names):
+        result["has_password_input"] = True
+        result["has_login_form"] = True
+        result["password_input_count"] += sum(1 for t in types if t == "password")
 
-        if r.status_code >= 400:
-            return result
+    result["hidden_input_count"] += sum(1 for t in types if t == "hidden")
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        base_host = _host(r.url)
+    if (
+        any(any(cl in n for cl in _CARD_LIKE_FIELDS) for n in names)
+        or (any(t in ("tel", "number") for t in types) and any("card" in n for n in names))
+    ):
+        result["has_card_inputs"] = True
 
-        forms = soup.find_all("form")
-        result["form_count"] = len(forms)
+    result["detected_fields"].extend(names)
 
-        result["iframe_count"] = len(soup.find_all("iframe"))
 
-        scripts = soup.find_all("script")
-        result["script_tag_count"] = len(scripts)
+def _analyze_content(result: Dict, final_url: str, content: bytes) -> Dict:
+    """Fill ``result`` with signals extracted from already-fetched HTML.
 
-        title = soup.find("title")
-        if title and title.text:
-            result["page_title"] = title.text.strip()
+    ``content`` is the raw response body; passing bytes lets the parser
+    detect the document encoding itself. Uses the selectolax (lexbor) tree
+    when installed, which avoids bs4's per-node Python wrapper objects.
+    """
+    if _SelectolaxParser is not None:
+        return _analyze_content_selectolax(result, final_url, content)
+    return _analyze_content_soup(result, final_url, content)
+
+
+def _analyze_content_selectolax(result: Dict, final_url: str, content: bytes) -> Dict:
+    tree = _SelectolaxParser(content)
+    root = tree.root
+    if root is None:
+        return result
+    base_host = _host(final_url)
+
+    form_count = 0
+    iframe_count = 0
+    script_count = 0
+    external_script_count = 0
+    saw_title = False
+    external_links: List[str] = []
+    suspicious_js: List[str] = []
+
+    for node in root.traverse(include_text=False):
+        tag = node.tag
+        if tag == "form":
+            form_count += 1
+            attrs = node.attributes
+            action = attrs.get("action") or ""
+            if action and _is_external(base_host, urljoin(final_url, action)):
+                result["external_form_action"] = True
+
+            names = []
+            types = []
+            for inp in node.css("input"):
+                inp_attrs = inp.attributes
+                field_name = inp_attrs.get("name")
+                if field_name:
+                    names.append(field_name.lower())
+                field_type = inp_attrs.get("type")
+                if field_type:
+                    types.append(field_type.lower())
+
+            _scan_form_fields(names, types, result)
+        elif tag == "iframe":
+            iframe_count += 1
+        elif tag == "script":
+            script_count += 1
+            src = node.attributes.get("src")
+            if src:
+                if _is_external(base_host, urljoin(final_url, src)):
+                    external_script_count += 1
+            else:
+                script_text = node.text(deep=True) or ""
+                for keyword in SUSPICIOUS_JS_KEYWORDS:
+                    if keyword in script_text and keyword not in suspicious_js:
+                        suspicious_js.append(keyword)
+        elif tag == "a":
+            href = node.attributes.get("href")
+            if href:
+                href = urljoin(final_url, href)
+                if href and _is_external(base_host, href):
+                    external_links.append(href)
+        elif tag == "title":
+            if not saw_title:
+                saw_title = True
+                title_text = node.text(deep=True)
+                if title_text:
+                    result["page_title"] = title_text.strip()
+        elif tag == "meta":
+            http_equiv = node.attributes.get("http-equiv")
+            if http_equiv and http_equiv.strip().lower() == "refresh":
+                result["meta_refresh"] = True
+
+    result["form_count"] = form_count
+    result["iframe_count"] = iframe_count
+    result["script_tag_count"] = script_count
+    result["external_script_count"] = external_script_count
+    result["external_link_count"] = len(external_links)
+    result["external_domain_count"] = _count_external_domains(base_host, external_links)
+    result["suspicious_js_keywords"] = suspicious_js
+    result["word_count"] = len(root.text(deep=True, separator=" ").split())
+    result["detected_fields"] = list(dict.fromkeys(result["detected_fields"]))
 
-        anchor_tags = soup.find_all("a", href=True)
-        external_links: List[str] = []
-        for a in anchor_tags:
-            href = urljoin(r.url, a.get("href", ""))
-            if href and _is_external(base_host, href):
-                external_links.append(href)
+    return result
 
-        result["external_link_count"] = len(external_links)
-        result["external_domain_count"] = _count_external_domains(base_host, external_links)
 
-        for script in scripts:
-            src = script.get("src")
+def _analyze_content_soup(result: Dict, final_url: str, content: bytes) -> Dict:
+    soup = BeautifulSoup(content, _BS_PARSER)
+    base_host = _host(final_url)
+
+    form_count = 0
+    iframe_count = 0
+    script_count = 0
+    external_script_count = 0
+    word_count = 0
+    saw_title = False
+    external_links: List[str] = []
+    suspicious_js: List[str] = []
+
+    # Every find_all() is another O(nodes) Python-level walk over the tree,
+    # so make a single pass and dispatch on the tag name instead.
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            continue
+        name = node.name
+        if name == "form":
+            form_count += 1
+            action = node.get("action") or ""
+            if action and _is_external(base_host, urljoin(final_url, action)):
+                result["external_form_action"] = True
+
+            names = []
+            types = []
+            for inp in node.find_all("input"):
+                field_name = inp.get("name")
+                if field_name:
+                    names.append(field_name.lower())
+                field_type = inp.get("type")
+                if field_type:
+                    types.append(field_type.lower())
+
+            _scan_form_fields(names, types, result)
+        elif name == "iframe":
+            iframe_count += 1
+        elif name == "script":
+            script_count += 1
+            src = node.get("src")
             if src:
-                full_src = urljoin(r.url, src)
-                if _is_external(base_host, full_src):
-                    result["external_script_count"] += 1
+                if _is_external(base_host, urljoin(final_url, src)):
+                    external_script_count += 1
             else:
-                content = script.text or ""
+                script_text = node.text or ""
                 for keyword in SUSPICIOUS_JS_KEYWORDS:
-                    if keyword in content and keyword not in result["suspicious_js_keywords"]:
-                        result["suspicious_js_keywords"].append(keyword)
-
-        meta_refresh = soup.find("meta", attrs={"http-equiv": lambda v: v and v.lower() == "refresh"})
-        result["meta_refresh"] = meta_refresh is not None
-
-        text = soup.get_text(separator=" ", strip=True)
-        if text:
-            result["word_count"] = len(text.split())
-
-        for form in forms:
-            action = form.get("action") or ""
-            if action:
-                action_url = urljoin(r.url, action)
-                if _is_external(base_host, action_url):
-                    result["external_form_action"] = True
-
-            inputs = form.find_all("input")
-            names = [inp.get("name", "").lower() for inp in inputs if inp.get("name")]
-            types = [inp.get("type", "").lower() for inp in inputs if inp.get("type")]
-
-            if "password" in types or any("password" in n for n in names):
-                result["has_password_input"] = True
-                result["has_login_form"] = True
-                result["password_input_count"] += sum(1 for t in types if t == "password")
-
-            result["hidden_input_count"] += sum(1 for t in types if t == "hidden")
-
-            card_like = {
-                "card", "cardnumber", "card_number", "cc-number", "cc_number",
-                "ccnumber", "cvv", "cvc", "expiry", "exp",
-            }
-            if (
-                any(any(cl in n for cl in card_like) for n in names)
-                or (any(t in ("tel", "number") for t in types) and any("card" in n for n in names))
-            ):
-                result["has_card_inputs"] = True
-
-            result["detected_fields"].extend(names)
-
-        result["detected_fields"] = list(dict.fromkeys(result["detected_fields"]))
+                    if keyword in script_text and keyword not in suspicious_js:
+                        suspicious_js.append(keyword)
+        elif name == "a":
+            href = node.get("href")
+            if href:
+                href = urljoin(final_url, href)
+                if href and _is_external(base_host, href):
+                    external_links.append(href)
+        elif name == "title":
+            if not saw_title:
+                saw_title = True
+                if node.text:
+                    result["page_title"] = node.text.strip()
+        elif name == "meta":
+            http_equiv = node.get("http-equiv")
+            if http_equiv and http_equiv.strip().lower() == "refresh":
+                result["meta_refresh"] = True
+
+    # Stream strings once instead of materializing the full page text.
+    for string in soup.strings:
+        word_count += len(string.split())
+
+    result["form_count"] = form_count
+    result["iframe_count"] = iframe_count
+    result["script_tag_count"] = script_count
+    result["external_script_count"] = external_script_count
+    result["external_link_count"] = len(external_links)
+    result["external_domain_count"] = _count_external_domains(base_host, external_links)
+    result["suspicious_js_keywords"] = suspicious_js
+    result["word_count"] = word_count
+    result["detected_fields"] = list(dict.fromkeys(result["detected_fields"]))
+
+    return result
+
+
+def analyze_html_for_forms(url: str) -> Dict:
+    """
+    Returns a dict with keys:
+      - has_login_form (bool)
+      - has_password_input (bool)
+      - has_card_inputs (bool)
+      - detected_fields (list)
+    """
+    settings = get_settings()
+    result = _empty_result()
+
+    try:
+        with _get_session().get(
+            url,
+            timeout=settings.request_timeout,
+            allow_redirects=True,
+            stream=True,
+        ) as r:
+            result["status_code"] = r.status_code
+            result["final_url"] = r.url
+            result["redirect_count"] = len(r.history)
+
+            if r.status_code >= 400:
+                return result
+
+            # Read at most max_html_bytes so an adversarial multi-MB page
+            # cannot dominate memory or parser time.
+            body = r.raw.read(settings.max_html_bytes + 1, decode_content=True)
+
+        if len(body) > settings.max_html_bytes:
+            result["html_truncated"] = True
+            body = body[: settings.max_html_bytes]
+
+        _analyze_content(result, result["final_url"], body)
 
     except Exception:
         result["html_fetch_error"] = "request_failed"
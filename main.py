@@ -20,8 +20,15 @@ def main_loop():
             if url == "":
                 break
             features = extract_features(url)
-            features.update(analyze_domain(features["url"]))
-            features.update(check_tls(features["url"]))
+            features.update(
+                analyze_domain(
+                    features["url"],
+                    host=features["host"],
+                    digit_count=features["host_digit_count"],
+                    alpha_count=features["host_alpha_count"],
+                )
+            )
+            features.update(check_tls(features["url"], host=features["host"]))
             # safely analyze HTML (may be slow, but ok for demo)
             form_info = analyze_html_for_forms(features["url"])
             features.update(form_info)
@@ -2,15 +2,40 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+import threading
 
+# Loaded artifacts keyed by path pair; joblib.load on every call would re-read
+# the full pickle per URL. The mtimes are kept so a swapped model reloads.
+_artifact_cache: Dict[Tuple[str, str], Tuple[float, float, object, object]] = {}
+_artifact_cache_lock = threading.Lock()
 
-def score_with_model(features: Dict, model_path: str = "models/model.joblib", vectorizer_path: str = "models/vectorizer.pkl") -> Dict:
-    """Attempt to score with a serialized model if available."""
-    model_file = Path(model_path)
-    vectorizer_file = Path(vectorizer_path)
 
+def _load_artifacts(model_file: Path, vectorizer_file: Path) -> Tuple[object, object]:
+    import joblib
+
+    key = (str(model_file), str(vectorizer_file))
+    model_mtime = model_file.stat().st_mtime
+    vectorizer_mtime = vectorizer_file.stat().st_mtime
+
+    with _artifact_cache_lock:
+        cached = _artifact_cache.get(key)
+        if cached and cached[0] == model_mtime and cached[1] == vectorizer_mtime:
+            return cached[2], cached[3]
+
+    # mmap keeps large fitted arrays shared between processes instead of
+    # duplicating them in each worker's RAM.
+    model = joblib.load(model_file, mmap_mode="r")
+    vectorizer = joblib.load(vectorizer_file)
+
+    with _artifact_cache_lock:
+        _artifact_cache[key] = (model_mtime, vectorizer_mtime, model, vectorizer)
+    return model, vectorizer
+
+
+def _unavailable_reason(model_file: Path, vectorizer_file: Path) -> Optional[Dict]:
+    """Return an 'unavailable' result dict, or None when scoring can proceed."""
     if not model_file.exists() or not vectorizer_file.exists():
         return {
             "available": False,
@@ -24,22 +49,61 @@ def score_with_model(features: Dict, model_path: str = "models/model.joblib", ve
         }
 
     try:
-        import joblib
+        import joblib  # noqa: F401
     except ImportError:
         return {
             "available": False,
             "reason": "joblib is not installed",
         }
 
-    model = joblib.load(model_file)
-    vectorizer = joblib.load(vectorizer_file)
+    return None
 
-    text = features.get("url", "")
-    vector = vectorizer.transform([text])
-    score = float(model.predict_proba(vector)[0][1])
 
+def _score_result(score: float) -> Dict:
     return {
         "available": True,
         "score": round(score, 4),
         "label": "phishing" if score >= 0.5 else "legitimate",
     }
+
+
+def score_with_model(features: Dict, model_path: str = "models/model.joblib", vectorizer_path: str = "models/vectorizer.pkl") -> Dict:
+    """Attempt to score with a serialized model if available."""
+    model_file = Path(model_path)
+    vectorizer_file = Path(vectorizer_path)
+
+    unavailable = _unavailable_reason(model_file, vectorizer_file)
+    if unavailable is not None:
+        return unavailable
+
+    model, vectorizer = _load_artifacts(model_file, vectorizer_file)
+
+    text = features.get("url", "")
+    vector = vectorizer.transform([text])
+    score = float(model.predict_proba(vector)[0][1])
+
+    return _score_result(score)
+
+
+def score_with_model_batch(texts: List[str], model_path: str = "models/model.joblib", vectorizer_path: str = "models/vectorizer.pkl") -> List[Dict]:
+    """Score many URLs with one transform/predict_proba call.
+
+    sklearn's per-call overhead dwarfs the actual work for single rows, so
+    batch callers should prefer this over score_with_model in a loop.
+    """
+    if not texts:
+        return []
+
+    model_file = Path(model_path)
+    vectorizer_file = Path(vectorizer_path)
+
+    unavailable = _unavailable_reason(model_file, vectorizer_file)
+    if unavailable is not None:
+        return [dict(unavailable) for _ in texts]
+
+    model, vectorizer = _load_artifacts(model_file, vectorizer_file)
+
+    vectors = vectorizer.transform(texts)
+    scores = model.predict_proba(vectors)[:, 1]
+
+    return [_score_result(float(score)) for score in scores]
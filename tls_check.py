@@ -2,40 +2,115 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Tuple
 import socket
 import ssl
-from urllib.parse import urlparse
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from config import get_settings
+from url_features import parse_url
 
 
-def _normalize_url(url: str) -> str:
-    url = url.strip()
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "https://" + url
-    return url
+# Built once: creating a default context reloads the system CA bundle from
+# disk on every call, which dwarfs the handshake cost in bulk scans.
+# SSLContext is documented as safe for concurrent use.
+_SSL_CONTEXT = ssl.create_default_context()
 
+# Handshake results cached per host: a full TCP+TLS handshake costs hundreds
+# of milliseconds, and bulk scans commonly repeat hosts. Certificates do not
+# change mid-scan, so a short TTL is safe. Same pattern as the DNS cache in
+# domain_info.
+_TLS_CACHE_TTL = 3600.0
+_TLS_CACHE_MAX_ENTRIES = 1024
+_tls_cache: Dict[str, Tuple[float, Dict]] = {}
+_tls_cache_lock = threading.Lock()
 
-def _parse_cert_time(value: str | None) -> datetime | None:
+
+def clear_tls_cache() -> None:
+    """Drop all cached handshake results (e.g. to force re-checks)."""
+    with _tls_cache_lock:
+        _tls_cache.clear()
+    with _tls_session_lock:
+        _tls_sessions.clear()
+
+
+# TLS sessions kept per host so repeat handshakes resume instead of paying
+# the full 2-RTT exchange and asymmetric crypto again. Sessions are only
+# valid with the context that produced them, so this applies to the shared
+# default context; LRU-capped to bound memory.
+_TLS_SESSION_MAX_ENTRIES = 512
+_tls_sessions: "OrderedDict[str, ssl.SSLSession]" = OrderedDict()
+_tls_session_lock = threading.Lock()
+
+
+def _get_tls_session(host: str) -> ssl.SSLSession | None:
+    with _tls_session_lock:
+        session = _tls_sessions.get(host)
+        if session is not None:
+            _tls_sessions.move_to_end(host)
+        return session
+
+
+def _store_tls_session(host: str, session: ssl.SSLSession | None) -> None:
+    if session is None:
+        return
+    with _tls_session_lock:
+        _tls_sessions[host] = session
+        _tls_sessions.move_to_end(host)
+        while len(_tls_sessions) > _TLS_SESSION_MAX_ENTRIES:
+            _tls_sessions.popitem(last=False)
+
+
+def _parse_cert_time(value: str | None) -> float | None:
+    """Parse a certificate timestamp to epoch seconds (UTC)."""
     if not value:
         return None
     try:
-        timestamp = ssl.cert_time_to_seconds(value)
+        return ssl.cert_time_to_seconds(value)
     except ValueError:
         return None
-    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
 
-def check_tls(url: str) -> Dict:
-    """Attempt a TLS handshake and extract basic certificate signals."""
-    settings = get_settings()
-    normalized = _normalize_url(url)
-    parsed = urlparse(normalized)
-    host = parsed.hostname or ""
+def _fast_connect(host: str, port: int, timeout: float) -> socket.socket:
+    """Open a TCP connection tuned for a single TLS handshake.
+
+    TCP_NODELAY stops Nagle from delaying the small ClientHello/Finished
+    records behind ACKs; TCP_QUICKACK (Linux-only, hence best-effort)
+    trims delayed-ACK latency on the same exchange. create_connection is
+    kept for its address-family fallback, and its sockets are already
+    close-on-exec since Python makes fds non-inheritable by default.
+    """
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        quickack = getattr(socket, "TCP_QUICKACK", None)
+        if quickack is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, quickack, 1)
+            except OSError:
+                pass
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _copy_tls_result(result: Dict) -> Dict:
+    # cert_subject/cert_issuer are nested dicts; copy them so neither the
+    # cache nor downstream feature dicts share mutable state.
+    out = dict(result)
+    if out["cert_subject"] is not None:
+        out["cert_subject"] = dict(out["cert_subject"])
+    if out["cert_issuer"] is not None:
+        out["cert_issuer"] = dict(out["cert_issuer"])
+    return out
+
 
-    result = {
+def _empty_tls_result() -> Dict:
+    return {
         "tls_supported": False,
         "tls_version": None,
         "cert_subject": None,
@@ -44,16 +119,20 @@ def check_tls(url: str) -> Dict:
         "cert_is_self_signed": None,
     }
 
-    if not host:
-        return result
 
-    context = ssl.create_default_context()
+def _check_tls_host(host: str, context: ssl.SSLContext) -> Dict:
+    """Perform the handshake against ``host`` and assemble the signal dict."""
+    settings = get_settings()
+    result = _empty_tls_result()
+    session = _get_tls_session(host) if context is _SSL_CONTEXT else None
     try:
-        with socket.create_connection((host, 443), timeout=settings.tls_timeout) as sock:
-            with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+        with _fast_connect(host, 443, settings.tls_timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host, session=session) as tls_sock:
                 result["tls_supported"] = True
                 result["tls_version"] = tls_sock.version()
                 cert = tls_sock.getpeercert()
+                if context is _SSL_CONTEXT:
+                    _store_tls_session(host, tls_sock.session)
     except (OSError, ssl.SSLError):
         return result
 
@@ -63,9 +142,8 @@ def check_tls(url: str) -> Dict:
     not_after = _parse_cert_time(cert.get("notAfter") if cert else None)
     days_remaining = None
     if not_after:
-        now = datetime.now(timezone.utc)
-        delta = not_after - now
-        days_remaining = max(delta.days, 0)
+        # Plain epoch math: no datetime objects just to read a day delta.
+        days_remaining = max(int((not_after - time.time()) // 86400), 0)
 
     result.update(
         {
@@ -76,3 +154,53 @@ def check_tls(url: str) -> Dict:
         }
     )
     return result
+
+
+def check_tls(url: str, host: str | None = None, context: ssl.SSLContext | None = None) -> Dict:
+    """Attempt a TLS handshake and extract basic certificate signals.
+
+    ``host`` may be supplied by callers that already parsed the URL,
+    saving a redundant normalization and urlparse per stage. ``context``
+    overrides the shared default context (e.g. for a custom CA bundle)
+    and bypasses the per-host result cache. Callers receive a copy, so
+    mutating the returned dict cannot poison cached entries.
+    """
+    if host is None:
+        host = parse_url(url)["host"]
+
+    if not host:
+        return _empty_tls_result()
+
+    if context is not None:
+        return _check_tls_host(host, context)
+
+    now = time.monotonic()
+    with _tls_cache_lock:
+        cached = _tls_cache.get(host)
+        if cached and now - cached[0] < _TLS_CACHE_TTL:
+            return _copy_tls_result(cached[1])
+
+    result = _check_tls_host(host, _SSL_CONTEXT)
+    # Only successful handshakes are cached: the TTL rationale (certs do
+    # not change mid-scan) says nothing about transient network failures,
+    # which should be retried on the next call. Same policy as the DNS
+    # cache in domain_info.
+    if result["tls_supported"]:
+        with _tls_cache_lock:
+            if host not in _tls_cache and len(_tls_cache) >= _TLS_CACHE_MAX_ENTRIES:
+                _tls_cache.pop(next(iter(_tls_cache)))
+            _tls_cache[host] = (time.monotonic(), result)
+    return _copy_tls_result(result)
+
+
+def check_tls_many(urls, workers: int = 64) -> list:
+    """Check many URLs concurrently; results match the order of ``urls``.
+
+    The handshake is network-bound (the thread spends almost all of its
+    time in socket waits), so a thread pool overlaps N handshakes with no
+    pickling cost. Preferred over looping check_tls for bulk work.
+    """
+    if workers <= 1 or len(urls) <= 1:
+        return [check_tls(url) for url in urls]
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+        return list(executor.map(check_tls, urls))
@@ -1,45 +1,126 @@
 # url_features.py
 # Basic URL feature extraction for phishing detection
 
-import re
 import math
-from urllib.parse import urlparse, parse_qs
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse, unquote_plus
 
-SUSPECT_KEYWORDS = [
+SUSPECT_KEYWORDS = (
     "login", "verify", "secure", "account", "update", "confirm",
     "bank", "payment", "billing", "card", "verify-account"
-]
+)
+
+# TLDs that boost suspicion; shared with heuristic_scorer so the two
+# modules cannot drift apart, and frozenset membership beats rebuilding
+# a tuple per call.
+SUSPICIOUS_TLDS = frozenset({"zip", "xyz", "top", "gq", "tk", "ml"})
+
+# Characters that do not count towards special_char_count.
+_URL_ALLOWED_CHARS = frozenset(":/.?&=-_")
+
+# One lookahead-alternation pass replaces a substring search per keyword.
+# The lookahead keeps overlapping hits and the containment map re-adds
+# keywords nested inside a longer match (e.g. "verify" in "verify-account"),
+# so the result is identical to checking each keyword separately.
+_KW_RE = re.compile("(?=(" + "|".join(sorted(map(re.escape, SUSPECT_KEYWORDS), key=len, reverse=True)) + "))")
+_KW_WITHIN = {
+    kw: frozenset(other for other in SUSPECT_KEYWORDS if other != kw and other in kw)
+    for kw in SUSPECT_KEYWORDS
+}
+
+def _entropy_from_freq(freq: dict, n: int) -> float:
+    # Factored form H = log2(n) - (1/n) * sum(v * log2(v)): one division
+    # for the whole string instead of one per unique character.
+    log2 = math.log2
+    total = sum(v * log2(v) for v in freq.values())
+    return log2(n) - total / n
+
+
+def _char_freq(s: str) -> dict:
+    # Counter's counting loop runs in C, unlike a per-character dict loop.
+    return Counter(s)
 
+
+@lru_cache(maxsize=4096)
 def _entropy(s: str) -> float:
-    """Calculate Shannon entropy of a string."""
+    """Calculate Shannon entropy of a string (memoized; inputs repeat often)."""
     if not s:
         return 0.0
-    freq = {}
-    for ch in s:
-        freq[ch] = freq.get(ch, 0) + 1
-    ent = 0.0
-    n = len(s)
-    for v in freq.values():
-        p = v / n
-        ent -= p * math.log2(p)
-    return ent
+    return _entropy_from_freq(_char_freq(s), len(s))
 
 def _contains_ipv4(host: str) -> bool:
-    """Return True if host looks like an IPv4 address."""
-    return bool(re.fullmatch(r"\d{1,3}(\.\d{1,3}){3}", host))
+    """Return True if host is a dotted-quad IPv4 address."""
+    parts = host.split(".")
+    if len(parts) != 4:
+        return False
+    return all(p.isdigit() and len(p) <= 3 and int(p) < 256 for p in parts)
 
-def parse_url(url: str) -> dict:
-    """Normalize and parse a URL, ensure scheme exists for parsing."""
+def _count_query_params(query: str) -> int:
+    """Count distinct query keys, matching len(parse_qs(query)).
+
+    parse_qs percent-decodes every value and builds a dict of lists just
+    to be counted; this keeps its semantics (skip segments without "=" or
+    with an empty value, dedupe on the decoded key) without that work.
+    """
+    if not query:
+        return 0
+    keys = set()
+    for seg in query.split("&"):
+        eq = seg.find("=")
+        if eq < 0 or eq == len(seg) - 1:
+            continue
+        key = seg[:eq]
+        if "%" in key or "+" in key:
+            key = unquote_plus(key)
+        keys.add(key)
+    return len(keys)
+
+
+# Shared stub for inputs rejected before parsing; built once at import.
+_EMPTY_PARSED = urlparse("")
+
+
+@lru_cache(maxsize=4096)
+def _parse_url_cached(url: str) -> tuple:
+    """Normalize and parse, memoized: crawlers re-see the same URLs often."""
     url = url.strip()
-    if not url.startswith("http://") and not url.startswith("https://"):
+    # Tuple-of-prefixes form is a single C call instead of two scans.
+    if not url.startswith(("http://", "https://")):
         url = "http://" + url
     parsed = urlparse(url)
+    # .hostname is a pure-Python property that re-splits and lowercases
+    # the netloc on every access; evaluate it once per distinct URL here.
+    return url, parsed, parsed.hostname or ""
+
+
+def parse_url(url: str) -> dict:
+    """Normalize and parse a URL, ensure scheme exists for parsing.
+
+    Inputs too short or with neither a dot nor a scheme separator cannot
+    yield host/TLD features; noisy log feeds are full of such tokens, so
+    they return a stub before paying for urlparse (and never pollute the
+    parse cache).
+    """
+    url = url.strip()
+    if len(url) < 4 or ("." not in url and "://" not in url):
+        return {
+            "normalized": url,
+            "parsed": _EMPTY_PARSED,
+            "path": "",
+            "query": "",
+            "host": "",
+            "scheme": "",
+        }
+    normalized, parsed, host = _parse_url_cached(url)
     return {
-        "normalized": url,
+        "normalized": normalized,
         "parsed": parsed,
         "path": parsed.path or "",
         "query": parsed.query or "",
-        "host": parsed.hostname or "",
+        "host": host,
         "scheme": parsed.scheme or ""
     }
 
@@ -53,30 +134,46 @@ def extract_features(url: str) -> dict:
     # basic metrics
     url_length = len(p["normalized"])
     path_length = len(path)
-    param_count = len(parse_qs(query))
+    param_count = _count_query_params(query)
     tld = ""
     suspicious_tld = False
     if host and "." in host:
         tld = host.split(".")[-1].lower()
-        if tld in ("zip", "xyz", "top", "gq", "tk", "ml"):
+        if tld in SUSPICIOUS_TLDS:
             suspicious_tld = True
 
-    # suspicious elements
-    has_at = "@" in p["normalized"]
+    # suspicious elements: one C-level frequency pass over the URL covers
+    # the @-check and the special-character tally (per unique character)
+    url_freq = Counter(p["normalized"])
+    has_at = "@" in url_freq
     has_double_slash = "//" in p["normalized"].split("://")[-1]
     has_ip = _contains_ipv4(host)
 
     # keywords
     url_lower = p["normalized"].lower()
-    keywords_found = [kw for kw in SUSPECT_KEYWORDS if kw in url_lower]
+    kw_hits = set(_KW_RE.findall(url_lower))
+    for kw in tuple(kw_hits):
+        kw_hits |= _KW_WITHIN[kw]
+    keywords_found = [kw for kw in SUSPECT_KEYWORDS if kw in kw_hits]
     suspect_keyword_count = len(keywords_found)
 
-    # entropy
-    host_entropy = _entropy(host)
+    # entropy and per-character host stats from a single frequency pass;
+    # analyze_domain consumes the counts instead of re-scanning the host
+    host_freq = _char_freq(host)
+    host_entropy = _entropy_from_freq(host_freq, len(host)) if host else 0.0
+    host_digit_count = 0
+    host_alpha_count = 0
+    for ch, v in host_freq.items():
+        if ch.isdigit():
+            host_digit_count += v
+        elif ch.isalpha():
+            host_alpha_count += v
     path_entropy = _entropy(path)
 
     dot_count_in_host = host.count(".")
-    special_char_count = sum(1 for ch in p["normalized"] if not ch.isalnum() and ch not in (":", "/", ".", "?", "&", "=", "-", "_"))
+    special_char_count = sum(
+        v for ch, v in url_freq.items() if not ch.isalnum() and ch not in _URL_ALLOWED_CHARS
+    )
 
     features = {
         "url": p["normalized"],
@@ -94,8 +191,50 @@ def extract_features(url: str) -> dict:
         "keywords_found": keywords_found,
         "host_entropy": round(host_entropy, 4),
         "path_entropy": round(path_entropy, 4),
+        "host_digit_count": host_digit_count,
+        "host_alpha_count": host_alpha_count,
         "dot_count_in_host": dot_count_in_host,
         "special_char_count": special_char_count
     }
 
     return features
+
+
+def extract_features_many(urls, workers=None) -> list:
+    """Extract features for many URLs; results match the order of ``urls``.
+
+    Feature extraction is pure-Python CPU work, so threads would serialize
+    on the GIL; a process pool with a large chunksize amortizes the IPC
+    cost and scales with cores. Small batches stay serial since spawning
+    workers would cost more than the extraction itself.
+    """
+    if workers == 1 or len(urls) < 512:
+        return [extract_features(url) for url in urls]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(extract_features, urls, chunksize=256))
+
+
+# Columns of extract_features output, in emission order. Kept explicit so
+# extract_features_batch produces stable column order for DataFrame callers.
+FEATURE_COLUMNS = (
+    "url", "scheme", "host", "tld", "suspicious_tld", "has_ip",
+    "url_length", "path_length", "param_count", "has_at",
+    "has_double_slash", "suspect_keyword_count", "keywords_found",
+    "host_entropy", "path_entropy", "host_digit_count", "host_alpha_count",
+    "dot_count_in_host", "special_char_count",
+)
+
+
+def extract_features_batch(urls, workers=None) -> dict:
+    """Extract features for many URLs as columns (one list per feature).
+
+    Training pipelines turn per-URL dicts into a table anyway; building
+    the columns directly skips millions of small dicts and feeds
+    ``pandas.DataFrame(...)`` (or csv.writer) with zero reshaping.
+    """
+    columns = {name: [] for name in FEATURE_COLUMNS}
+    appenders = [columns[name].append for name in FEATURE_COLUMNS]
+    for features in extract_features_many(urls, workers=workers):
+        for append, name in zip(appenders, FEATURE_COLUMNS):
+            append(features[name])
+    return columns